@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""Generate Rust test cases for rotation conversions from scipy reference values.
+
+Emits a Rust module of #[test] functions, one per sampled rotation. Each test
+holds the quaternion (w, x, y, z), axis-angle, rotation-vector and rotation
+matrix representations of the same rotation, as computed by
+scipy.spatial.transform.Rotation, and checks that they agree with each other
+to within a small tolerance. The generated file is the ground truth for the
+Rust-side conversion code.
+
+Usage:
+    python scripts/generate_scipy_test_cases.py [-o tests/scipy_rotation_tests.rs]
+"""
+
+import io
+import math
+import os
+import struct
+import sys
+from pathlib import Path
+
+TWO_PI = 2.0 * math.pi
+
+# Tolerance for the generated Rust assertions. The constants are f32, so
+# anything much tighter than 1e-5 starts tripping on rounding alone.
+TOL = 1e-5
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / "tests" / "scipy_rotation_tests.rs"
+
+# Fixed seed so the random block is reproducible across runs.
+RANDOM_SEED = 42
+
+# numpy and scipy together cost a couple hundred milliseconds to import,
+# which dominates runs that only print usage or reject bad arguments.
+# They are loaded lazily by _import_heavy on the first call that needs
+# them, which also builds the constants and optional kernel below.
+np = None
+Rotation = None
+_UNIT_AXES = None
+_rotvec_to_all = None
+
+
+def _import_heavy():
+    """Import numpy/scipy on first use and set up their dependents."""
+    global np, Rotation, _UNIT_AXES, _rotvec_to_all
+    if np is not None:
+        return
+    import numpy as _np
+    from scipy.spatial.transform import Rotation as _Rotation
+
+    np = _np
+    Rotation = _Rotation
+
+    # Non-principal test axes, normalized once here instead of per run.
+    _UNIT_AXES = [
+        (np.array([0.0, 1.0, 0.0]), "axis_y"),
+        (np.array([0.0, 0.0, 1.0]), "axis_z"),
+        (np.array([1.0, 1.0, 0.0]) / math.sqrt(2.0), "axis_xy"),
+        (np.array([1.0, 0.0, 1.0]) / math.sqrt(2.0), "axis_xz"),
+        (np.array([0.0, 1.0, 1.0]) / math.sqrt(2.0), "axis_yz"),
+        (np.array([1.0, 1.0, 1.0]) / math.sqrt(3.0), "axis_xyz"),
+        (np.array([1.0, -2.0, 3.0]) / math.sqrt(14.0), "axis_skew"),
+    ]
+
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional; the numpy path is always available
+        return
+
+    @njit(cache=True)
+    def _kernel(rv):  # rv: (N, 3) float64
+        """Compiled rotvec -> (axis, angle, rotvec) conversion in f32."""
+        n_rows = rv.shape[0]
+        axes = np.zeros((n_rows, 3), np.float32)
+        angles = np.zeros(n_rows, np.float32)
+        rotvecs = np.zeros((n_rows, 3), np.float32)
+        for i in range(n_rows):
+            n2 = rv[i, 0] ** 2 + rv[i, 1] ** 2 + rv[i, 2] ** 2
+            if n2 < 1e-24:
+                continue
+            n = np.sqrt(n2)
+            a = n % TWO_PI
+            angles[i] = a
+            inv = 1.0 / n
+            for k in range(3):
+                axes[i, k] = rv[i, k] * inv
+                rotvecs[i, k] = rv[i, k] * inv * a
+        return axes, angles, rotvecs
+
+    _rotvec_to_all = _kernel
+
+
+_f32_pack = struct.Struct("f").pack
+_f32_unpack = struct.Struct("f").unpack
+
+
+def _to_f32(x):
+    """Round a Python float through IEEE-754 single precision.
+
+    The struct round-trip runs entirely in CPython's C layer, with none
+    of the 0-d ndarray allocation a scalar np.float32(x) incurs.
+    """
+    return _f32_unpack(_f32_pack(x))[0]
+
+
+def rotation_to_test_case(r, label):
+    """Build the per-test dict of f32 representations for one Rotation."""
+    _import_heavy()
+    # scalar_first=True gives (w, x, y, z) directly; no reorder needed.
+    q = r.as_quat(scalar_first=True)
+    rv = r.as_rotvec()
+    mat = r.as_matrix()
+
+    # Norm and axis are computed exactly once; the squared norm is enough
+    # for the degenerate check.
+    rv_norm_sq = float(rv @ rv)
+    if rv_norm_sq < 1e-24:
+        axis = np.zeros(3)
+        angle = 0.0
+        rotvec = {"x": 0.0, "y": 0.0, "z": 0.0}
+    else:
+        rv_norm = math.sqrt(rv_norm_sq)
+        # rv_norm is non-negative, so a plain modulo lands in [0, 2*pi).
+        angle = rv_norm % TWO_PI
+        axis = rv / rv_norm
+        rotvec = {
+            "x": _to_f32(axis[0] * angle),
+            "y": _to_f32(axis[1] * angle),
+            "z": _to_f32(axis[2] * angle),
+        }
+
+    return {
+        "label": label,
+        "quat": {
+            "w": _to_f32(q[0]),
+            "x": _to_f32(q[1]),
+            "y": _to_f32(q[2]),
+            "z": _to_f32(q[3]),
+        },
+        "axis_angle": {
+            "x": _to_f32(axis[0]),
+            "y": _to_f32(axis[1]),
+            "z": _to_f32(axis[2]),
+            "angle": _to_f32(angle),
+        },
+        "rotvec": rotvec,
+        "rotation_matrix": mat.astype(np.float32),
+    }
+
+
+# Below this many rotations the one-off JIT warm-up costs more than the
+# Python-side glue it replaces.
+_NUMBA_THRESHOLD = 4096
+
+
+def rotations_to_test_cases(r_batch, labels):
+    """Build test-case dicts for a multi-rotation Rotation in one pass.
+
+    Unlike calling rotation_to_test_case per rotation, this makes a single
+    as_quat / as_rotvec / as_matrix call for the whole batch, so the scipy
+    crossing cost is paid once rather than three times per rotation.
+    """
+    _import_heavy()
+    q_wxyz = r_batch.as_quat(scalar_first=True)  # (N, 4)
+    rv = r_batch.as_rotvec()  # (N, 3)
+    mat = r_batch.as_matrix()  # (N, 3, 3)
+
+    if _rotvec_to_all is not None and rv.shape[0] >= _NUMBA_THRESHOLD:
+        axes32, angles32, rotvecs32 = _rotvec_to_all(rv)
+    else:
+        # einsum beats np.linalg.norm for tiny fixed-size rows.
+        norms = np.sqrt(np.einsum("ij,ij->i", rv, rv))
+        # norms are non-negative, so one vectorized modulo normalizes every
+        # angle into [0, 2*pi) without the scalar negative-wrap branch.
+        angles = np.mod(norms, TWO_PI)
+        # Branchless near-zero handling: divide by a padded norm everywhere,
+        # then mask the degenerate rows to zero.
+        zero_mask = (norms < 1e-12)[:, None]
+        safe_norms = np.where(norms < 1e-12, 1.0, norms)
+        axes = np.where(zero_mask, 0.0, rv / safe_norms[:, None])
+        rotvecs = axes * angles[:, None]
+        axes32 = axes.astype(np.float32)
+        angles32 = angles.astype(np.float32)
+        rotvecs32 = rotvecs.astype(np.float32)
+
+    # One contiguous cast per array instead of ~20 scalar _to_f32 round-trips
+    # per case.
+    q32 = q_wxyz.astype(np.float32)
+    mat32 = mat.astype(np.float32)
+
+    # Format every literal for the whole batch in one pass, laid out in
+    # the order _case_floats consumes them; the values are already
+    # f32-rounded, so plain repr is enough.
+    n_cases = len(labels)
+    flat = np.concatenate(
+        [
+            q32,
+            axes32,
+            angles32[:, None],
+            rotvecs32,
+            mat32.reshape(n_cases, 9),
+        ],
+        axis=1,
+    ).reshape(-1)
+    literals = [f"{x!r}_f32" for x in flat.tolist()]
+
+    cases = []
+    for i, label in enumerate(labels):
+        cases.append(
+            {
+                "label": label,
+                "quat": {
+                    "w": float(q32[i, 0]),
+                    "x": float(q32[i, 1]),
+                    "y": float(q32[i, 2]),
+                    "z": float(q32[i, 3]),
+                },
+                "axis_angle": {
+                    "x": float(axes32[i, 0]),
+                    "y": float(axes32[i, 1]),
+                    "z": float(axes32[i, 2]),
+                    "angle": float(angles32[i]),
+                },
+                "rotvec": {
+                    "x": float(rotvecs32[i, 0]),
+                    "y": float(rotvecs32[i, 1]),
+                    "z": float(rotvecs32[i, 2]),
+                },
+                # A (3, 3) view into the contiguous (N, 3, 3) float32 block;
+                # no per-entry Python floats until format time.
+                "rotation_matrix": mat32[i],
+                "literals": tuple(literals[20 * i : 20 * (i + 1)]),
+            }
+        )
+    return cases
+
+
+def generate_all_test_cases():
+    """Sample rotations covering the cases the visualizer cares about.
+
+    Rotations within each block are constructed through a single batched
+    scipy call (one (N, 3) / (N, 4) array per block) rather than one
+    Rotation per Python call, which amortizes the Cython crossing cost.
+    Yields case dicts one block at a time so the consumer never needs
+    the whole set in memory.
+    """
+    _import_heavy()
+
+    # Block 1: identity and quarter/half turns about the principal axes.
+    rotvecs = []
+    labels = []
+    rotvecs.append([0.0, 0.0, 0.0])
+    labels.append("identity")
+    for axis_idx, axis_name in enumerate("xyz"):
+        for angle_deg in (90, 180, 270):
+            rv = [0.0, 0.0, 0.0]
+            rv[axis_idx] = math.radians(angle_deg)
+            rotvecs.append(rv)
+            labels.append(f"{axis_name}_{angle_deg}deg")
+    yield from rotations_to_test_cases(Rotation.from_rotvec(np.asarray(rotvecs)), labels)
+
+    # Block 2: small angles, where axis extraction is numerically touchy.
+    rotvecs = []
+    labels = []
+    for angle in (1e-3, 1e-6):
+        rotvecs.append([angle, 0.0, 0.0])
+        labels.append(f"small_x_{angle:.0e}".replace("-", "m"))
+    yield from rotations_to_test_cases(Rotation.from_rotvec(np.asarray(rotvecs)), labels)
+
+    # Block 3: angles near the 2*pi wrap-around.
+    rotvecs = []
+    labels = []
+    for angle, lbl in ((TWO_PI - 1e-3, "near_two_pi"), (math.pi - 1e-6, "near_pi")):
+        rotvecs.append([0.0, 0.0, angle])
+        labels.append(lbl)
+    yield from rotations_to_test_cases(Rotation.from_rotvec(np.asarray(rotvecs)), labels)
+
+    # Block 4: a fixed angle about assorted non-principal axes.
+    rs = Rotation.from_rotvec(np.stack([a * (math.pi / 3) for a, _ in _UNIT_AXES]))
+    yield from rotations_to_test_cases(rs, [f"{name}_60deg" for _, name in _UNIT_AXES])
+
+    # Block 5: Euler-angle combinations, including a gimbal-lock pose.
+    eulers_deg = [
+        ([30, 0, 0], "euler_roll_30"),
+        ([0, 45, 0], "euler_pitch_45"),
+        ([0, 0, 60], "euler_yaw_60"),
+        ([30, 45, 60], "euler_30_45_60"),
+        ([10, 90, 20], "euler_gimbal_lock"),
+        ([-30, -45, -60], "euler_negative"),
+    ]
+    rs = Rotation.from_euler("xyz", np.array([e for e, _ in eulers_deg]), degrees=True)
+    yield from rotations_to_test_cases(rs, [lbl for _, lbl in eulers_deg])
+
+    # Block 6: quaternions given directly, exercising the double cover.
+    quats_xyzw = [
+        ([0.0, 0.0, 0.0, -1.0], "quat_negative_identity"),
+        ([0.5, 0.5, 0.5, 0.5], "quat_half"),
+        ([-0.5, -0.5, -0.5, -0.5], "quat_half_negated"),
+    ]
+    rs = Rotation.from_quat(np.array([q for q, _ in quats_xyzw]), scalar_first=False)
+    yield from rotations_to_test_cases(rs, [lbl for _, lbl in quats_xyzw])
+
+    # Block 7: random rotations; the explicit size keeps this one
+    # vectorized Cython call drawing from the shared seed.
+    r_batch = Rotation.random(10, rng=np.random.default_rng(RANDOM_SEED))
+    yield from rotations_to_test_cases(r_batch, [f"random_{i}" for i in range(10)])
+
+
+def _rust_f32_literal(x):
+    """Format a value as a Rust f32 literal.
+
+    repr of a float already yields a valid Rust literal (including the
+    scientific-notation and +/-1.0 forms), so the only special case left
+    is a nonzero input underflowing to zero.
+    """
+    v = _to_f32(x)
+    if v == 0.0 and x != 0:
+        # Underflowed to zero; keep a plain literal rather than repr's -0.0.
+        return "0.0_f32"
+    return f"{v!r}_f32"
+
+
+_TOL_LITERAL = _rust_f32_literal(TOL)
+
+
+def _case_floats(c):
+    """Flatten a case's 19 float values in the order _rust_case consumes them."""
+    q = c["quat"]
+    aa = c["axis_angle"]
+    rv = c["rotvec"]
+    m = c["rotation_matrix"]  # (3, 3) float32 ndarray
+    return (
+        q["w"], q["x"], q["y"], q["z"],
+        aa["x"], aa["y"], aa["z"], aa["angle"],
+        rv["x"], rv["y"], rv["z"],
+        *m.ravel().tolist(),
+    )
+
+
+# One .format call per case; {0} is the label, {1} the tolerance literal and
+# {2}..{21} the flat literal tuple from _case_floats. Trailing blank line is
+# part of the template so cases concatenate with plain "".join.
+_CASE_TEMPLATE = """\
+    #[test]
+    fn scipy_{0}() {{
+        const TOL: f32 = {1};
+        // w, x, y, z
+        let quat = [{2}, {3}, {4}, {5}];
+        // x, y, z, angle
+        let axis_angle = [{6}, {7}, {8}, {9}];
+        let rotvec = [{10}, {11}, {12}];
+        let matrix = [
+            [{13}, {14}, {15}],
+            [{16}, {17}, {18}],
+            [{19}, {20}, {21}],
+        ];
+        let m = quat_to_matrix(&quat);
+        for i in 0..3 {{
+            for j in 0..3 {{
+                assert!(
+                    (m[i][j] - matrix[i][j]).abs() <= TOL,
+                    "matrix[{{}}][{{}}]: {{}} vs {{}}", i, j, m[i][j], matrix[i][j]
+                );
+            }}
+        }}
+        for k in 0..3 {{
+            assert!((axis_angle[k] * axis_angle[3] - rotvec[k]).abs() <= TOL);
+        }}
+    }}
+
+"""
+
+
+def _rust_case(c, lits):
+    """Render one test case as a Rust #[test] function."""
+    return _CASE_TEMPLATE.format(c["label"], _TOL_LITERAL, *lits)
+
+
+_MODULE_HEADER = """\
+// Generated by scripts/generate_scipy_test_cases.py -- do not edit by hand.
+#[allow(dead_code)]
+mod scipy_rotation_tests {
+    fn quat_to_matrix(q: &[f32; 4]) -> [[f32; 3]; 3] {
+        let (w, x, y, z) = (q[0], q[1], q[2], q[3]);
+        [
+            [
+                1.0 - 2.0 * (y * y + z * z),
+                2.0 * (x * y - z * w),
+                2.0 * (x * z + y * w),
+            ],
+            [
+                2.0 * (x * y + z * w),
+                1.0 - 2.0 * (x * x + z * z),
+                2.0 * (y * z - x * w),
+            ],
+            [
+                2.0 * (x * z - y * w),
+                2.0 * (y * z + x * w),
+                1.0 - 2.0 * (x * x + y * y),
+            ],
+        ]
+    }
+
+"""
+
+
+def _render_case(c):
+    """Format a case's literals and render it; picklable for worker pools."""
+    lits = c.get("literals")
+    if lits is None:
+        # Scalar-built cases carry no batch-formatted literals; the values
+        # are already f32-rounded, so this is plain repr work.
+        lits = [_rust_f32_literal(v) for v in _case_floats(c)]
+    return _rust_case(c, lits)
+
+
+# Below this many cases the process-pool startup costs more than the
+# formatting it parallelizes.
+_PARALLEL_THRESHOLD = 512
+
+
+def _write_rust_module(cases, fh):
+    """Stream the Rust test module for an iterable of cases into fh.
+
+    Cases are rendered and written one at a time, so the full module is
+    never held in memory. Sequences large enough to amortize the worker
+    startup are formatted across all cores. Returns the number of cases
+    written.
+    """
+    n = 0
+    fh.write(_MODULE_HEADER)
+    if hasattr(cases, "__len__") and len(cases) >= _PARALLEL_THRESHOLD:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(cases) // (os.cpu_count() or 1))
+        with ProcessPoolExecutor() as ex:
+            for body in ex.map(_render_case, cases, chunksize=chunksize):
+                fh.write(body)
+                n += 1
+    else:
+        for c in cases:
+            fh.write(_render_case(c))
+            n += 1
+    fh.write("}\n")
+    return n
+
+
+def _generate_rust_module(cases):
+    """Assemble the full Rust source for the generated test module."""
+    buf = io.StringIO()
+    _write_rust_module(cases, buf)
+    return buf.getvalue()
+
+
+_USAGE = f"""\
+usage: generate_scipy_test_cases.py [-h] [-o OUTPUT]
+
+{__doc__.splitlines()[0]}
+
+options:
+  -h, --help            show this help message and exit
+  -o, --output OUTPUT   path of the Rust test file to write
+                        (default: {DEFAULT_OUTPUT})\
+"""
+
+
+def main(argv=None):
+    # Hand-rolled parse for the two flags this script has, so -h and
+    # argument errors return before numpy/scipy are ever imported.
+    argv = sys.argv[1:] if argv is None else argv
+    output = DEFAULT_OUTPUT
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-h", "--help"):
+            print(_USAGE)
+            return 0
+        if arg in ("-o", "--output"):
+            i += 1
+            if i == len(argv):
+                print(f"error: {arg} requires a path", file=sys.stderr)
+                return 2
+            output = Path(argv[i])
+        elif arg.startswith("--output="):
+            output = Path(arg.partition("=")[2])
+        else:
+            print(f"error: unrecognized argument: {arg}", file=sys.stderr)
+            return 2
+        i += 1
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", buffering=1 << 16) as fh:
+        n = _write_rust_module(generate_all_test_cases(), fh)
+    print(f"Wrote {n} test cases to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())